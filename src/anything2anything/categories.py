@@ -5,6 +5,7 @@ This module provides the formal notion of "category" for file types and handles
 extension normalization and category resolution.
 """
 
+import functools
 from enum import Enum
 from pathlib import Path
 from typing import Optional
@@ -66,6 +67,24 @@ EXTENSION_ALIASES: dict[str, str] = {
     "jpeg": "jpg",
 }
 
+# Flat lookup table used by get_category: every raw extension and alias maps
+# straight to its category, so resolution is a single dict lookup
+_EXTENSION_TO_CATEGORY_FLAT: dict[str, Category] = dict(EXTENSION_TO_CATEGORY)
+for _alias, _target in EXTENSION_ALIASES.items():
+    _EXTENSION_TO_CATEGORY_FLAT[_alias] = EXTENSION_TO_CATEGORY[_target]
+del _alias, _target
+
+# Supported extensions, sorted once at import for listings and error messages
+_SUPPORTED_SORTED: tuple[str, ...] = tuple(sorted(EXTENSION_TO_CATEGORY))
+_SUPPORTED_BY_CATEGORY: dict[Category, tuple[str, ...]] = {
+    category: tuple(ext for ext in _SUPPORTED_SORTED if EXTENSION_TO_CATEGORY[ext] == category)
+    for category in Category
+}
+_UNSUPPORTED_FORMAT_MESSAGE = (
+    "Unsupported file format: {ext}\n"
+    f"Supported formats: {', '.join(_SUPPORTED_SORTED)}"
+)
+
 
 def normalize_extension(ext: str) -> str:
     """
@@ -108,9 +127,9 @@ def get_extension(path: str | Path) -> str:
         >>> get_extension(Path("document.docx"))
         'docx'
     """
-    path_obj = Path(path)
-    ext = path_obj.suffix
-    return normalize_extension(ext)
+    if not isinstance(path, Path):
+        path = Path(path)
+    return normalize_extension(path.suffix)
 
 
 def get_category(path: str | Path) -> Category:
@@ -126,15 +145,24 @@ def get_category(path: str | Path) -> Category:
     Raises:
         ValueError: If the file extension is not supported.
     """
-    ext = get_extension(path)
-    category = EXTENSION_TO_CATEGORY.get(ext)
+    if not isinstance(path, Path):
+        path = Path(path)
+    return _category_for_ext(path.suffix[1:].lower())
+
+
+@functools.lru_cache(maxsize=64)
+def _category_for_ext(ext: str) -> Category:
+    """
+    Resolve a lowercase extension (without leading dot) to its category.
+
+    Results are cached per extension; unsupported extensions are not cached
+    since the ValueError propagates out of the cached call.
+    """
+    category = _EXTENSION_TO_CATEGORY_FLAT.get(ext)
 
     if category is None:
         ext_with_dot = f".{ext}" if ext else "(no extension)"
-        raise ValueError(
-            f"Unsupported file format: {ext_with_dot}\n"
-            f"Supported formats: {', '.join(sorted(set(EXTENSION_TO_CATEGORY.keys())))}"
-        )
+        raise ValueError(_UNSUPPORTED_FORMAT_MESSAGE.format(ext=ext_with_dot))
 
     return category
 
@@ -150,7 +178,5 @@ def get_supported_extensions(category: Optional[Category] = None) -> list[str]:
         List of supported extensions (normalized, without leading dot).
     """
     if category is None:
-        return sorted(set(EXTENSION_TO_CATEGORY.keys()))
-    return sorted(
-        ext for ext, cat in EXTENSION_TO_CATEGORY.items() if cat == category
-    )
+        return list(_SUPPORTED_SORTED)
+    return list(_SUPPORTED_BY_CATEGORY[category])
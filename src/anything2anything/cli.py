@@ -6,21 +6,46 @@ This module provides a command-line interface for converting files within the sa
 category using external tools (FFmpeg, ImageMagick, LibreOffice).
 """
 
+import functools
+import glob
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 import typer
-from rich.console import Console
 
-from anything2anything.converters import ConversionError, ToolNotFoundError
-from anything2anything.dispatcher import CategoryMismatchError, convert_file
+from anything2anything.converters import ConversionError, ToolNotFoundError, VideoQuality
+from anything2anything.dispatcher import CategoryMismatchError, convert_file, convert_files
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 app = typer.Typer(
     name="anything2anything",
     help="Convert files between formats within the same category (audio, video, image, document, spreadsheet, presentation).",
     add_completion=False,
 )
-console = Console()
+batch_app = typer.Typer(
+    name="anything2anything batch",
+    help="Convert many files to a single target format in parallel.",
+    add_completion=False,
+)
+
+
+@functools.cache
+def _get_console(stderr: bool = False) -> "Console":
+    """
+    Return a shared rich console, importing rich on first use.
+
+    rich is only needed once there is something to print, so deferring the
+    import keeps it off the path between startup and the first subprocess.
+
+    Args:
+        stderr: If True, return a console that writes to standard error.
+    """
+    from rich.console import Console
+
+    return Console(stderr=stderr)
 
 
 @app.command()
@@ -39,6 +64,19 @@ def main(
         "-v",
         help="Print detailed information about the conversion process",
     ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help=(
+            "Pipe audio and image data through the converter's stdin/stdout instead of "
+            "passing file paths; the whole input and output are held in memory"
+        ),
+    ),
+    quality: VideoQuality = typer.Option(
+        VideoQuality.FAST,
+        "--quality",
+        help="Video encoding speed/size trade-off (fast, balanced or best)",
+    ),
 ) -> None:
     """
     Convert a file from one format to another.
@@ -63,16 +101,17 @@ def main(
 
         # Convert with force overwrite
         anything2anything input.mp4 output.mov --force
+
+    To convert many files at once, see `anything2anything batch --help`.
     """
     input_file = Path(input_path).resolve()
     output_file = Path(output_path).resolve()
 
     # Check if output file already exists
     if output_file.exists() and not force:
-        console.print(
+        _get_console(stderr=True).print(
             f"[red]Error:[/red] Output file already exists: {output_file}\n"
-            f"Use --force to overwrite it.",
-            file=sys.stderr,
+            f"Use --force to overwrite it."
         )
         sys.exit(1)
 
@@ -80,38 +119,159 @@ def main(
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        convert_file(input_file, output_file, verbose=verbose)
-        console.print(f"[green]Success:[/green] Converted {input_file.name} -> {output_file.name}")
+        convert_file(input_file, output_file, verbose=verbose, stream=stream, quality=quality)
+        _get_console().print(f"[green]Success:[/green] Converted {input_file.name} -> {output_file.name}")
     except FileNotFoundError as e:
-        console.print(f"[red]Error:[/red] {e}", file=sys.stderr)
+        _get_console(stderr=True).print(f"[red]Error:[/red] {e}")
         sys.exit(1)
     except ValueError as e:
-        console.print(f"[red]Error:[/red] {e}", file=sys.stderr)
+        _get_console(stderr=True).print(f"[red]Error:[/red] {e}")
         sys.exit(1)
     except CategoryMismatchError as e:
-        console.print(f"[red]Error:[/red] {e}", file=sys.stderr)
+        _get_console(stderr=True).print(f"[red]Error:[/red] {e}")
         sys.exit(1)
     except ToolNotFoundError as e:
-        console.print(f"[red]Error:[/red] {e}", file=sys.stderr)
+        _get_console(stderr=True).print(f"[red]Error:[/red] {e}")
         sys.exit(1)
     except ConversionError as e:
-        console.print(f"[red]Error:[/red] {e}", file=sys.stderr)
+        _get_console(stderr=True).print(f"[red]Error:[/red] {e}")
         sys.exit(1)
     except Exception as e:
-        console.print(
-            f"[red]Unexpected error:[/red] {e}",
-            file=sys.stderr,
-        )
+        _get_console(stderr=True).print(f"[red]Unexpected error:[/red] {e}")
         if verbose:
             import traceback
 
-            console.print(traceback.format_exc(), file=sys.stderr)
+            _get_console(stderr=True).print(traceback.format_exc())
+        sys.exit(1)
+
+
+def _expand_inputs(inputs: list[str]) -> list[Path]:
+    """
+    Expand input arguments into a de-duplicated list of resolved file paths.
+
+    Arguments containing glob characters are expanded (so quoted patterns work
+    even where the shell does not expand them); other arguments are taken as-is.
+    """
+    files: list[Path] = []
+    for pattern in inputs:
+        if any(char in pattern for char in "*?["):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            files.extend(Path(match).resolve() for match in matches if Path(match).is_file())
+        else:
+            files.append(Path(pattern).resolve())
+    return list(dict.fromkeys(files))
+
+
+@batch_app.command()
+def batch(
+    inputs: list[str] = typer.Argument(..., help="Input files or glob patterns"),
+    out_dir: str = typer.Argument(..., help="Directory to write converted files to"),
+    to: str = typer.Option(
+        ...,
+        "--to",
+        "-t",
+        help="Target format extension (e.g. webp, mp3, pdf)",
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Overwrite output files if they already exist",
+    ),
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Print detailed information about the conversion process",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of parallel conversions (default: based on CPU count)",
+    ),
+    quality: VideoQuality = typer.Option(
+        VideoQuality.FAST,
+        "--quality",
+        help="Video encoding speed/size trade-off (fast, balanced or best)",
+    ),
+) -> None:
+    """
+    Convert many files to one target format, running conversions in parallel.
+
+    Each input is written to OUT_DIR with its original name and the target
+    extension. The same-category rule applies to every file.
+
+    Examples:
+        # Convert all HEIC photos to JPG
+        anything2anything batch inputs/*.heic outputs/ --to jpg
+
+        # Convert documents using at most 2 parallel LibreOffice instances
+        anything2anything batch "inputs/**/*.docx" outputs/ --to pdf --jobs 2
+    """
+    input_files = _expand_inputs(inputs)
+    if not input_files:
+        _get_console(stderr=True).print("[red]Error:[/red] No input files matched.")
+        sys.exit(1)
+
+    output_dir = Path(out_dir).resolve()
+    target_ext = to.lstrip(".")
+    conversions = [
+        (input_file, output_dir / f"{input_file.stem}.{target_ext}")
+        for input_file in input_files
+    ]
+
+    # Refuse to start if two inputs would be written to the same output file
+    sources: dict[Path, Path] = {}
+    for input_file, output_file in conversions:
+        if output_file in sources:
+            _get_console(stderr=True).print(
+                f"[red]Error:[/red] Both {sources[output_file]} and {input_file} "
+                f"would be converted to {output_file}"
+            )
+            sys.exit(1)
+        sources[output_file] = input_file
+
+    if not force:
+        existing = [output_file for _, output_file in conversions if output_file.exists()]
+        if existing:
+            for output_file in existing:
+                _get_console(stderr=True).print(
+                    f"[red]Error:[/red] Output file already exists: {output_file}"
+                )
+            _get_console(stderr=True).print("Use --force to overwrite them.")
+            sys.exit(1)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    failures = 0
+    for input_file, output_file, error in convert_files(
+        conversions, verbose=verbose, max_workers=jobs, quality=quality
+    ):
+        if error is None:
+            _get_console().print(
+                f"[green]Success:[/green] Converted {input_file.name} -> {output_file.name}"
+            )
+        else:
+            failures += 1
+            _get_console(stderr=True).print(f"[red]Error:[/red] {input_file.name}: {error}")
+
+    if failures:
+        _get_console(stderr=True).print(
+            f"[red]{failures} of {len(conversions)} conversion(s) failed.[/red]"
+        )
         sys.exit(1)
 
 
 def cli() -> None:
     """Entry point for the console script."""
-    app()
+    # A single Typer command cannot also take subcommands, so route the
+    # batch mode here and keep `anything2anything INPUT OUTPUT` unchanged
+    if sys.argv[1:2] == ["batch"]:
+        batch_app(args=sys.argv[2:], prog_name="anything2anything batch")
+    else:
+        app()
 
 
 if __name__ == "__main__":
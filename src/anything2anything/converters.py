@@ -5,10 +5,123 @@ This module contains the actual conversion logic that invokes external tools
 (FFmpeg, ImageMagick, LibreOffice) to perform file conversions.
 """
 
+import csv
+import errno
+import functools
+import importlib.util
+import math
+import os
 import shutil
+import socket
 import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Optional, Union
+
+# Display names of the external tools, for error messages
+_TOOL_NAMES: dict[str, str] = {
+    "ffmpeg": "FFmpeg",
+    "magick": "ImageMagick",
+    "soffice": "LibreOffice",
+}
+
+# Only the end of a tool's standard error is kept for error messages; FFmpeg
+# writes progress lines there for the whole length of an encode
+_STDERR_TAIL_BYTES = 64 * 1024
+
+# LibreOffice user profile to run soffice with, or None for the default one.
+# Concurrent soffice instances sharing a profile block on its lock, so batch
+# workers each switch to a private profile via isolate_libreoffice_profile().
+_libreoffice_profile: Optional[Path] = None
+
+# Port of a running OfficeListener that convert_document should drive over
+# UNO, or None to start soffice for every conversion
+_office_listener_port: Optional[int] = None
+# UNO Desktop connected to that listener, created on first use
+_office_desktop: Any = None
+
+# Threads per FFmpeg video encode, or None for every CPU available to the
+# process. Batch workers lower it via limit_ffmpeg_threads() so parallel
+# encodes share the CPUs instead of each using all of them.
+_ffmpeg_threads: Optional[int] = None
+
+# FFmpeg codec and quality flags for each audio output format
+_AUDIO_CODEC_FLAGS: dict[str, tuple[str, ...]] = {
+    # High quality VBR MP3
+    "mp3": ("-codec:a", "libmp3lame", "-q:a", "2"),
+    # Uncompressed PCM, 16-bit
+    "wav": ("-codec:a", "pcm_s16le"),
+    # AAC at 192 kbps
+    "m4a": ("-codec:a", "aac", "-b:a", "192k"),
+}
+
+# FFmpeg muxer flags for writing each audio format to a pipe. The MP4 family
+# normally seeks back to write its index at the end, which a pipe cannot do,
+# so m4a is written fragmented with the index up front.
+_AUDIO_PIPE_FORMATS: dict[str, tuple[str, ...]] = {
+    "mp3": ("-f", "mp3"),
+    "wav": ("-f", "wav"),
+    "m4a": ("-f", "ipod", "-movflags", "+frag_keyframe+empty_moov"),
+}
+
+# FFmpeg codec flags for each video output format
+_VIDEO_CODEC_FLAGS: dict[str, tuple[str, ...]] = {
+    # H.264 video + AAC audio, faststart for web streaming
+    "mp4": ("-codec:v", "libx264", "-codec:a", "aac", "-movflags", "+faststart"),
+    # H.264 + AAC for MOV
+    "mov": ("-codec:v", "libx264", "-codec:a", "aac"),
+}
+
+
+class VideoQuality(str, Enum):
+    """Speed versus compression trade-off for video encodes."""
+
+    FAST = "fast"
+    BALANCED = "balanced"
+    BEST = "best"
+
+
+# libx264 preset for each quality setting; "ultrafast" encodes several times
+# faster than the default "medium" at the cost of larger files
+_X264_PRESETS: dict[VideoQuality, str] = {
+    VideoQuality.FAST: "ultrafast",
+    VideoQuality.BALANCED: "medium",
+    VideoQuality.BEST: "slow",
+}
+
+# LibreOffice export filter for each target extension when converting over
+# UNO. Cross-category conversions are rejected earlier, so pdf output always
+# comes from a text document.
+_OFFICE_EXPORT_FILTERS: dict[str, str] = {
+    # Document
+    "docx": "MS Word 2007 XML",
+    "doc": "MS Word 97",
+    "odt": "writer8",
+    "txt": "Text",
+    "rtf": "Rich Text Format",
+    "pdf": "writer_pdf_Export",
+    # Spreadsheet
+    "csv": "Text - txt - csv (StarCalc)",
+    "ods": "calc8",
+    "xlsx": "Calc MS Excel 2007 XML",
+    "xls": "MS Excel 97",
+    "xlsm": "Calc MS Excel 2007 VBA XML",
+    # Presentation
+    "odp": "impress8",
+    "ppt": "MS PowerPoint 97",
+    "pptx": "Impress MS PowerPoint 2007 XML",
+}
+
+# Filter options per target extension; CSV is written comma-separated,
+# double-quoted, UTF-8 (character set 76)
+_OFFICE_FILTER_OPTIONS: dict[str, str] = {
+    "csv": "44,34,76",
+}
 
 
 class ConversionError(Exception):
@@ -23,17 +136,70 @@ class ToolNotFoundError(ConversionError):
     pass
 
 
-def check_tool_available(tool_name: str) -> bool:
+@functools.lru_cache(maxsize=None)
+def resolve_tool(tool_name: str) -> str:
     """
-    Check if an external tool is available in PATH.
+    Find the absolute path of an external tool in PATH.
+
+    The result is cached for the lifetime of the process, and commands are
+    started with the absolute path, so PATH is searched once per tool rather
+    than on every conversion and again on every exec.
 
     Args:
-        tool_name: Name of the tool to check (e.g., "ffmpeg", "magick", "soffice").
+        tool_name: Name of the tool (e.g., "ffmpeg", "magick", "soffice").
 
     Returns:
-        True if the tool is available, False otherwise.
+        Absolute path to the tool's executable.
+
+    Raises:
+        ToolNotFoundError: If the tool is not found in PATH.
+    """
+    path = shutil.which(tool_name)
+    if path is None:
+        raise ToolNotFoundError(
+            f"{_TOOL_NAMES.get(tool_name, tool_name)} is required for this conversion "
+            f"but '{tool_name}' was not found in PATH. Please install it."
+        )
+    return path
+
+
+def available_cpu_count() -> int:
+    """
+    Count the CPUs the current process may run on.
+
+    Unlike os.cpu_count(), this honours CPU affinity (taskset, cpusets in
+    containers) where the platform exposes it.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def limit_ffmpeg_threads(threads: int) -> None:
+    """
+    Cap the threads each FFmpeg video encode in this process may use.
+
+    Meant to be called once per worker process, with the available CPUs
+    divided among the workers.
+    """
+    global _ffmpeg_threads
+    _ffmpeg_threads = max(1, threads)
+
+
+def isolate_libreoffice_profile(profile_root: Path) -> None:
     """
-    return shutil.which(tool_name) is not None
+    Make LibreOffice use a profile private to the current process.
+
+    Meant to be called once per worker process when running several
+    conversions in parallel. The profile is created as a fresh directory
+    inside ``profile_root``; the caller owns that directory and removes it,
+    profiles included, once the workers are done.
+
+    Args:
+        profile_root: Existing private directory to create the profile in.
+    """
+    global _libreoffice_profile
+    _libreoffice_profile = Path(tempfile.mkdtemp(prefix="lo_profile_", dir=profile_root))
 
 
 def run_command(
@@ -44,9 +210,13 @@ def run_command(
     """
     Run a shell command and handle errors.
 
+    Standard error is drained while the command runs and only its last
+    _STDERR_TAIL_BYTES are kept, so long FFmpeg encodes neither block on a
+    full pipe nor accumulate their whole progress log in memory.
+
     Args:
         cmd: Command and arguments as a list.
-        verbose: If True, print the command and its output.
+        verbose: If True, print the command and pass its standard output through.
         tool_name: Name of the tool for error messages.
 
     Raises:
@@ -57,30 +227,145 @@ def run_command(
         print(f"Running: {' '.join(cmd)}")
 
     try:
-        result = subprocess.run(
+        # close_fds=False keeps CPython on its posix_spawn fast path (Python
+        # < 3.13 falls back to fork+exec otherwise); descriptors opened by
+        # Python are non-inheritable anyway, so nothing extra leaks
+        process = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            check=False,
+            stdin=subprocess.DEVNULL,
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            close_fds=False,
         )
     except FileNotFoundError:
         raise ToolNotFoundError(
             f"{tool_name} not found in PATH. Please install it and ensure it's available."
         )
 
-    if result.returncode != 0:
-        error_msg = f"{tool_name} failed with exit code {result.returncode}"
-        if verbose or result.stderr:
-            error_msg += f"\nError output:\n{result.stderr}"
-        if verbose and result.stdout:
-            error_msg += f"\nStandard output:\n{result.stdout}"
-        raise ConversionError(error_msg)
+    with process:
+        stderr = _read_tail(process.stderr, _STDERR_TAIL_BYTES)
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise _command_failed(tool_name, returncode, stderr.decode(errors="replace"), verbose)
+
+
+def _read_tail(stream: IO[bytes], limit: int) -> bytes:
+    """Read a stream to EOF, keeping only its last ``limit`` bytes."""
+    tail = bytearray()
+    truncated = False
+    for chunk in iter(functools.partial(stream.read1, 65536), b""):
+        tail += chunk
+        if len(tail) > limit:
+            del tail[:-limit]
+            truncated = True
+    if truncated:
+        # Drop the partial first line left over from trimming
+        return b"...\n" + bytes(tail[tail.find(b"\n") + 1 :])
+    return bytes(tail)
+
+
+def run_piped_command(
+    cmd: list[str],
+    input_data: bytes,
+    verbose: bool = False,
+    tool_name: str = "external tool",
+) -> bytes:
+    """
+    Run a command that reads its input from stdin and writes its output to stdout.
+
+    The input and the whole output are held in memory; only the last
+    _STDERR_TAIL_BYTES of standard error are kept.
+
+    Args:
+        cmd: Command and arguments as a list.
+        input_data: Bytes to feed to the command's standard input.
+        verbose: If True, print the command and include its output in errors.
+        tool_name: Name of the tool for error messages.
+
+    Returns:
+        Everything the command wrote to standard output.
+
+    Raises:
+        ToolNotFoundError: If the tool is not found in PATH.
+        ConversionError: If the command fails.
+    """
+    if verbose:
+        print(f"Running: {' '.join(cmd)}")
+
+    try:
+        # close_fds=False for the posix_spawn fast path, as in run_command
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=False,
+        )
+    except FileNotFoundError:
+        raise ToolNotFoundError(
+            f"{tool_name} not found in PATH. Please install it and ensure it's available."
+        )
+
+    with process:
+        # Feed stdin and drain stderr on helper threads while stdout is read
+        # here, so no pipe fills up and stalls the tool; stderr keeps only
+        # its tail, as in run_command
+        stderr_tail: list[bytes] = []
+        threads = [
+            threading.Thread(target=_feed_stdin, args=(process.stdin, input_data)),
+            threading.Thread(
+                target=lambda: stderr_tail.append(
+                    _read_tail(process.stderr, _STDERR_TAIL_BYTES)
+                )
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        output = process.stdout.read()
+        for thread in threads:
+            thread.join()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise _command_failed(
+            tool_name, returncode, stderr_tail[0].decode(errors="replace"), verbose
+        )
+    return output
+
+
+def _feed_stdin(stdin: IO[bytes], data: bytes) -> None:
+    """Write ``data`` to a child's standard input and close it."""
+    try:
+        stdin.write(data)
+    except BrokenPipeError:
+        # The tool exited without reading everything; its exit code says why
+        pass
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def _command_failed(
+    tool_name: str,
+    returncode: int,
+    stderr: str,
+    verbose: bool,
+) -> ConversionError:
+    """Build the ConversionError reported when an external tool fails."""
+    error_msg = f"{tool_name} failed with exit code {returncode}"
+    if verbose or stderr:
+        error_msg += f"\nError output:\n{stderr}"
+    return ConversionError(error_msg)
 
 
 def convert_audio(
     input_path: Path,
     output_path: Path,
     verbose: bool = False,
+    target_ext: Optional[str] = None,
 ) -> None:
     """
     Convert audio files using FFmpeg.
@@ -91,40 +376,65 @@ def convert_audio(
         input_path: Path to input audio file.
         output_path: Path to output audio file.
         verbose: If True, print the command being executed.
+        target_ext: Normalized output extension (lowercase, without leading
+            dot), if already known; derived from output_path otherwise.
 
     Raises:
         ToolNotFoundError: If FFmpeg is not found.
         ConversionError: If conversion fails.
     """
-    if not check_tool_available("ffmpeg"):
-        raise ToolNotFoundError(
-            "FFmpeg is required for audio conversion. Please install it."
-        )
+    ffmpeg = resolve_tool("ffmpeg")
 
-    ext = output_path.suffix.lower().lstrip(".")
-    cmd = ["ffmpeg", "-i", str(input_path), "-y"]  # -y to overwrite (we check separately)
-
-    # Configure codec and quality based on target format
-    if ext == "mp3":
-        # High quality VBR MP3
-        cmd.extend(["-codec:a", "libmp3lame", "-q:a", "2"])
-    elif ext == "wav":
-        # Uncompressed PCM, 16-bit
-        cmd.extend(["-codec:a", "pcm_s16le"])
-    elif ext == "m4a":
-        # AAC at 192 kbps
-        cmd.extend(["-codec:a", "aac", "-b:a", "192k"])
-    else:
+    ext = target_ext or output_path.suffix.lower().lstrip(".")
+    flags = _AUDIO_CODEC_FLAGS.get(ext)
+    if flags is None:
         raise ConversionError(f"Unsupported audio output format: {ext}")
 
-    cmd.append(str(output_path))
+    # -y to overwrite (we check separately)
+    cmd = [ffmpeg, "-i", str(input_path), "-y", *flags, str(output_path)]
     run_command(cmd, verbose=verbose, tool_name="FFmpeg")
 
 
+def convert_audio_piped(
+    in_bytes: bytes,
+    out_fmt: str,
+    verbose: bool = False,
+) -> bytes:
+    """
+    Convert audio data in memory by piping it through FFmpeg.
+
+    Avoids intermediate files when chaining conversions. Inputs that store
+    their index at the end of the file (m4a without faststart) cannot be read
+    from a pipe; convert those with convert_audio instead.
+
+    Args:
+        in_bytes: Contents of the input audio file.
+        out_fmt: Target format extension (mp3, wav, m4a).
+        verbose: If True, print the command being executed.
+
+    Returns:
+        Contents of the converted audio file.
+
+    Raises:
+        ToolNotFoundError: If FFmpeg is not found.
+        ConversionError: If conversion fails.
+    """
+    ffmpeg = resolve_tool("ffmpeg")
+
+    flags = _AUDIO_CODEC_FLAGS.get(out_fmt)
+    if flags is None:
+        raise ConversionError(f"Unsupported audio output format: {out_fmt}")
+
+    cmd = [ffmpeg, "-i", "pipe:0", *flags, *_AUDIO_PIPE_FORMATS[out_fmt], "pipe:1"]
+    return run_piped_command(cmd, in_bytes, verbose=verbose, tool_name="FFmpeg")
+
+
 def convert_video(
     input_path: Path,
     output_path: Path,
     verbose: bool = False,
+    target_ext: Optional[str] = None,
+    quality: VideoQuality = VideoQuality.FAST,
 ) -> None:
     """
     Convert video files using FFmpeg.
@@ -135,38 +445,34 @@ def convert_video(
         input_path: Path to input video file.
         output_path: Path to output video file.
         verbose: If True, print the command being executed.
+        target_ext: Normalized output extension (lowercase, without leading
+            dot), if already known; derived from output_path otherwise.
+        quality: Encoder speed/size trade-off, mapped to a libx264 preset.
 
     Raises:
         ToolNotFoundError: If FFmpeg is not found.
         ConversionError: If conversion fails.
     """
-    if not check_tool_available("ffmpeg"):
-        raise ToolNotFoundError(
-            "FFmpeg is required for video conversion. Please install it."
-        )
-
-    ext = output_path.suffix.lower().lstrip(".")
-    cmd = ["ffmpeg", "-i", str(input_path), "-y"]  # -y to overwrite (we check separately)
+    ffmpeg = resolve_tool("ffmpeg")
 
-    if ext == "mp4":
-        # H.264 video + AAC audio, faststart for web streaming
-        cmd.extend(
-            [
-                "-codec:v",
-                "libx264",
-                "-codec:a",
-                "aac",
-                "-movflags",
-                "+faststart",
-            ]
-        )
-    elif ext == "mov":
-        # H.264 + AAC for MOV
-        cmd.extend(["-codec:v", "libx264", "-codec:a", "aac"])
-    else:
+    ext = target_ext or output_path.suffix.lower().lstrip(".")
+    flags = _VIDEO_CODEC_FLAGS.get(ext)
+    if flags is None:
         raise ConversionError(f"Unsupported video output format: {ext}")
 
-    cmd.append(str(output_path))
+    # -y to overwrite (we check separately)
+    cmd = [
+        ffmpeg,
+        "-i",
+        str(input_path),
+        "-y",
+        *flags,
+        "-preset",
+        _X264_PRESETS[VideoQuality(quality)],
+        "-threads",
+        str(_ffmpeg_threads or available_cpu_count()),
+        str(output_path),
+    ]
     run_command(cmd, verbose=verbose, tool_name="FFmpeg")
 
 
@@ -174,6 +480,7 @@ def convert_image(
     input_path: Path,
     output_path: Path,
     verbose: bool = False,
+    target_ext: Optional[str] = None,
 ) -> None:
     """
     Convert image files using ImageMagick.
@@ -184,67 +491,153 @@ def convert_image(
         input_path: Path to input image file.
         output_path: Path to output image file.
         verbose: If True, print the command being executed.
+        target_ext: Normalized output extension, if already known. Unused, as
+            ImageMagick picks the format from output_path; accepted so every
+            converter can be called the same way.
 
     Raises:
         ToolNotFoundError: If ImageMagick is not found.
         ConversionError: If conversion fails.
     """
-    if not check_tool_available("magick"):
-        raise ToolNotFoundError(
-            "ImageMagick is required for image conversion. Please install it."
-        )
+    magick = resolve_tool("magick")
 
-    cmd = ["magick", str(input_path), str(output_path)]
+    cmd = [magick, str(input_path), str(output_path)]
     run_command(cmd, verbose=verbose, tool_name="ImageMagick")
 
 
+def convert_images_batch(
+    input_paths: list[Path],
+    output_dir: Path,
+    target_ext: str,
+    verbose: bool = False,
+) -> None:
+    """
+    Convert many images with a single ImageMagick ``mogrify`` run.
+
+    ImageMagick initializes once for the whole set instead of once per file.
+    Each image is written to output_dir with its input basename and the
+    target extension.
+
+    Args:
+        input_paths: Paths to input image files.
+        output_dir: Directory to write the converted images to.
+        target_ext: Target format extension (without leading dot).
+        verbose: If True, print the command being executed.
+
+    Raises:
+        ToolNotFoundError: If ImageMagick is not found.
+        ConversionError: If conversion of any of the images fails.
+    """
+    magick = resolve_tool("magick")
+
+    cmd = [magick, "mogrify", "-format", target_ext, "-path", str(output_dir)]
+    cmd.extend(str(input_path) for input_path in input_paths)
+    run_command(cmd, verbose=verbose, tool_name="ImageMagick")
+
+
+def convert_image_piped(
+    in_bytes: bytes,
+    out_fmt: str,
+    verbose: bool = False,
+) -> bytes:
+    """
+    Convert image data in memory by piping it through ImageMagick.
+
+    The input format is detected from the data itself.
+
+    Args:
+        in_bytes: Contents of the input image file.
+        out_fmt: Target format extension (e.g., "webp", "png").
+        verbose: If True, print the command being executed.
+
+    Returns:
+        Contents of the converted image file.
+
+    Raises:
+        ToolNotFoundError: If ImageMagick is not found.
+        ConversionError: If conversion fails.
+    """
+    magick = resolve_tool("magick")
+
+    cmd = [magick, "-", f"{out_fmt}:-"]
+    return run_piped_command(cmd, in_bytes, verbose=verbose, tool_name="ImageMagick")
+
+
 def convert_document(
     input_path: Path,
     output_path: Path,
     verbose: bool = False,
+    target_ext: Optional[str] = None,
 ) -> None:
     """
     Convert office documents using LibreOffice.
 
-    Supports documents, spreadsheets, and presentations.
+    Supports documents, spreadsheets, and presentations. Simple format pairs
+    (csv <-> xlsx, txt -> rtf, and csv/txt copies) are converted in Python
+    without starting LibreOffice; csv <-> xlsx needs openpyxl, and falls back
+    to LibreOffice when it is not installed.
 
     Args:
         input_path: Path to input office file.
         output_path: Path to output office file.
         verbose: If True, print the command being executed.
+        target_ext: Normalized output extension (lowercase, without leading
+            dot), if already known; derived from output_path otherwise.
 
     Raises:
+        FileNotFoundError: If the input file does not exist.
         ToolNotFoundError: If LibreOffice is not found.
         ConversionError: If conversion fails.
     """
-    if not check_tool_available("soffice"):
-        raise ToolNotFoundError(
-            "LibreOffice is required for office document conversion. Please install it."
-        )
-
     # LibreOffice expects the target extension without the dot
-    target_ext = output_path.suffix.lstrip(".")
-    output_dir = output_path.parent
-    output_basename = output_path.stem
+    target_ext = target_ext or output_path.suffix.lower().lstrip(".")
 
-    # LibreOffice writes to --outdir with the same basename but new extension
-    cmd = [
-        "soffice",
-        "--headless",
-        "--convert-to",
-        target_ext,
-        "--outdir",
-        str(output_dir),
-        str(input_path),
-    ]
+    native = _NATIVE_OFFICE_CONVERSIONS.get(
+        (input_path.suffix.lower().lstrip("."), target_ext)
+    )
+    if native is not None and native(input_path, output_path):
+        if verbose:
+            print(f"Converted {input_path} to {output_path} without LibreOffice")
+        return
 
-    run_command(cmd, verbose=verbose, tool_name="LibreOffice")
+    soffice = resolve_tool("soffice")
+
+    if _office_listener_port is not None and _convert_with_listener(
+        input_path, output_path, target_ext, verbose
+    ):
+        return
+
+    # soffice exits 0 even when it cannot load its input, so the input is
+    # checked up front; one stat is nothing next to starting soffice
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    output_dir = output_path.parent
 
     # LibreOffice creates the file with the input basename but new extension
     # We need to find it and rename it to match the requested output path
     expected_output = output_dir / f"{input_path.stem}.{target_ext}"
+    # A file already there must not be mistaken for soffice's output
+    stale_output = _file_identity(expected_output)
+
+    # LibreOffice writes to --outdir with the same basename but new extension
+    cmd = [soffice, "--headless"]
+    if _libreoffice_profile is not None:
+        cmd.append(f"-env:UserInstallation={_libreoffice_profile.as_uri()}")
+    cmd.extend(
+        [
+            "--convert-to",
+            target_ext,
+            "--outdir",
+            str(output_dir),
+            str(input_path),
+        ]
+    )
 
-    if not expected_output.exists():
+    run_command(cmd, verbose=verbose, tool_name="LibreOffice")
+
+    output_identity = _file_identity(expected_output)
+    if output_identity is None or output_identity == stale_output:
         raise ConversionError(
             f"LibreOffice did not produce expected output file: {expected_output}"
         )
@@ -253,4 +646,419 @@ def convert_document(
     if expected_output != output_path:
         if verbose:
             print(f"Renaming {expected_output} to {output_path}")
-        expected_output.rename(output_path)
+        _move_file(expected_output, output_path)
+
+
+def _file_identity(path: Path) -> Optional[tuple[int, int, int, int]]:
+    """Return (device, inode, size, mtime) of a file, or None if it is missing."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _copy_office_file(input_path: Path, output_path: Path) -> bool:
+    """Handle a same-format "conversion" by copying the file."""
+    try:
+        shutil.copyfile(input_path, output_path)
+    except shutil.SameFileError:
+        # Converting a file onto itself (with --force) leaves it as it is
+        pass
+    return True
+
+
+def _csv_to_xlsx(input_path: Path, output_path: Path) -> bool:
+    """
+    Convert a UTF-8 CSV file to XLSX with openpyxl, streaming row by row.
+
+    Rows go straight from the CSV reader into a write-only workbook, so
+    memory use stays flat regardless of file size. Numeric fields are stored
+    as numbers, as LibreOffice's CSV import does.
+
+    Returns:
+        False if openpyxl is missing or the file cannot be read this way (not
+        UTF-8, malformed or oversized fields, characters a worksheet cannot
+        hold), so the caller falls back to LibreOffice.
+    """
+    try:
+        import openpyxl
+        from openpyxl.utils.exceptions import IllegalCharacterError
+    except ImportError:
+        return False
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    try:
+        with open(input_path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.reader(f):
+                sheet.append([_csv_cell_value(field) for field in row])
+    except (UnicodeDecodeError, csv.Error, IllegalCharacterError):
+        return False
+    workbook.save(output_path)
+    return True
+
+
+def _csv_cell_value(field: str) -> Union[str, int, float, None]:
+    """Turn a CSV field into the value stored in a spreadsheet cell."""
+    if not field:
+        return None
+    # int() and float() accept digit separators, CSV imports do not
+    if "_" in field:
+        return field
+    try:
+        return int(field)
+    except ValueError:
+        pass
+    try:
+        value = float(field)
+    except ValueError:
+        return field
+    # Leave "nan", "inf" and friends as text
+    return value if math.isfinite(value) else field
+
+
+class _UncachedFormula(Exception):
+    """Raised by _xlsx_to_csv on a formula cell with no cached value."""
+
+
+def _xlsx_to_csv(input_path: Path, output_path: Path) -> bool:
+    """
+    Convert the active sheet of an XLSX file to a UTF-8 CSV file with openpyxl.
+
+    The sheet is read in read-only mode, streaming rows without loading the
+    whole workbook into memory. Formula cells are written with the values
+    cached in the file. Cells are written as raw values, not as displayed:
+    number formats are ignored, so dates come out in ISO form and
+    percentages as fractions, where LibreOffice would apply the format.
+
+    Returns:
+        False if openpyxl is missing, the file is not a readable workbook, or
+        a formula has no cached value to write, so the caller falls back to
+        LibreOffice, which recalculates. No partial output is left behind.
+    """
+    try:
+        import openpyxl
+    except ImportError:
+        return False
+
+    with ExitStack() as stack:
+        try:
+            # Cell values come from the first workbook; the second one, read
+            # in step, tells formulas without a cached result from empty cells
+            values = openpyxl.load_workbook(input_path, read_only=True, data_only=True)
+            # Read-only workbooks keep the file open until closed
+            stack.callback(values.close)
+            formulas = openpyxl.load_workbook(input_path, read_only=True)
+            stack.callback(formulas.close)
+        except Exception:
+            # Not a workbook openpyxl can open (BadZipFile, damaged XML,
+            # missing parts); nothing has been written yet
+            return False
+
+        # Sheet data is only parsed while rows are read, so a damaged sheet
+        # surfaces here as whatever openpyxl's parser raises
+        try:
+            with open(output_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                rows = zip(
+                    values.active.iter_rows(values_only=True),
+                    formulas.active.iter_rows(values_only=True),
+                )
+                for value_row, formula_row in rows:
+                    if any(
+                        value is None and formula is not None
+                        for value, formula in zip(value_row, formula_row)
+                    ):
+                        raise _UncachedFormula
+                    writer.writerow([_csv_field(value) for value in value_row])
+        except Exception:
+            # _UncachedFormula or a sheet openpyxl cannot read: drop the
+            # partial CSV and leave the file to LibreOffice
+            output_path.unlink(missing_ok=True)
+            return False
+    return True
+
+
+def _csv_field(value: object) -> object:
+    """Format a spreadsheet cell value for CSV output."""
+    if value is None:
+        return ""
+    # Booleans and whole numbers are written as LibreOffice writes them
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _txt_to_rtf(input_path: Path, output_path: Path) -> bool:
+    """
+    Convert a UTF-8 plain text file to RTF, one paragraph per line.
+
+    Returns:
+        False if the file is not UTF-8, so the caller falls back to LibreOffice.
+    """
+    try:
+        with open(input_path, encoding="utf-8-sig") as src, open(
+            output_path, "w", encoding="ascii"
+        ) as dst:
+            dst.write("{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0\\fmodern Courier New;}}\n")
+            for line in src:
+                dst.write(_rtf_escape(line.rstrip("\n")))
+                dst.write("\\par\n")
+            dst.write("}\n")
+    except UnicodeDecodeError:
+        output_path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def _rtf_escape(text: str) -> str:
+    """Escape plain text for an RTF body, encoding non-ASCII as \\uN escapes."""
+    escaped = []
+    for char in text:
+        if char in "\\{}":
+            escaped.append("\\" + char)
+        elif char == "\t":
+            escaped.append("\\tab ")
+        elif ord(char) < 0x80:
+            escaped.append(char)
+        else:
+            # \uN takes a signed 16-bit value; characters outside the BMP
+            # are written as a UTF-16 surrogate pair
+            data = char.encode("utf-16-le")
+            for i in range(0, len(data), 2):
+                unit = int.from_bytes(data[i : i + 2], "little", signed=True)
+                escaped.append(f"\\u{unit}?")
+    return "".join(escaped)
+
+
+# Office conversions done in Python, keyed by (input extension, target
+# extension). Each returns False when it cannot handle the file, in which
+# case LibreOffice is used instead.
+_NATIVE_OFFICE_CONVERSIONS: dict[tuple[str, str], Callable[[Path, Path], bool]] = {
+    ("csv", "csv"): _copy_office_file,
+    ("txt", "txt"): _copy_office_file,
+    ("csv", "xlsx"): _csv_to_xlsx,
+    ("xlsx", "csv"): _xlsx_to_csv,
+    ("txt", "rtf"): _txt_to_rtf,
+}
+
+
+def _move_file(source: Path, destination: Path) -> None:
+    """
+    Move a file, replacing any existing destination.
+
+    Uses a plain rename when both paths are on the same filesystem and falls
+    back to copying across filesystems.
+    """
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination)
+
+
+class OfficeListener:
+    """
+    A headless LibreOffice instance accepting UNO connections on a local port.
+
+    Starting soffice takes a second or two, so batch workers each keep a
+    listener running and convert their office files through it instead of
+    starting soffice per file. Use as a context manager, or call close().
+
+    Args:
+        startup_timeout: Seconds to wait for the listener to accept connections.
+        wait: If False, return as soon as soffice is started and leave the
+            wait to wait_ready(), so several listeners can start side by side.
+
+    Raises:
+        ToolNotFoundError: If LibreOffice is not found.
+        ConversionError: If the listener does not come up.
+    """
+
+    def __init__(self, startup_timeout: float = 30.0, wait: bool = True) -> None:
+        soffice = resolve_tool("soffice")
+
+        # Pick a free port; the listener binds it right after
+        with socket.socket() as sock:
+            sock.bind(("localhost", 0))
+            self.port: int = sock.getsockname()[1]
+
+        # A private profile keeps the listener independent from any
+        # LibreOffice instance the user already has open
+        self._profile_dir = Path(tempfile.mkdtemp(prefix="lo_listener_"))
+        self._process = subprocess.Popen(
+            [
+                soffice,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--norestore",
+                f"-env:UserInstallation={self._profile_dir.as_uri()}",
+                f"--accept=socket,host=localhost,port={self.port};urp;",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
+        )
+
+        self._deadline = time.monotonic() + startup_timeout
+        if wait:
+            self.wait_ready()
+
+    def wait_ready(self) -> None:
+        """
+        Block until the listener accepts connections.
+
+        Raises:
+            ConversionError: If soffice exits or the startup timeout passes first.
+        """
+        while True:
+            try:
+                with socket.create_connection(("localhost", self.port), timeout=1):
+                    break
+            except OSError:
+                if self._process.poll() is not None or time.monotonic() > self._deadline:
+                    self.close()
+                    raise ConversionError("LibreOffice listener failed to start")
+                time.sleep(0.1)
+
+    def close(self) -> None:
+        """Shut down the listener and remove its profile."""
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+    def __enter__(self) -> "OfficeListener":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def office_listener_supported() -> bool:
+    """
+    Check whether conversions can go through an OfficeListener.
+
+    Requires LibreOffice in PATH and its Python UNO bindings (the ``uno``
+    module shipped with LibreOffice) to be importable.
+    """
+    try:
+        resolve_tool("soffice")
+    except ToolNotFoundError:
+        return False
+    return importlib.util.find_spec("uno") is not None
+
+
+def use_office_listener(port: Optional[int]) -> None:
+    """
+    Route office conversions in this process through the listener on ``port``.
+
+    Pass None to go back to starting soffice per conversion.
+    """
+    global _office_listener_port, _office_desktop
+    _office_listener_port = port
+    _office_desktop = None
+
+
+def _convert_with_listener(
+    input_path: Path,
+    output_path: Path,
+    target_ext: str,
+    verbose: bool,
+) -> bool:
+    """
+    Convert an office file through the UNO listener.
+
+    Returns:
+        True if the file was converted, False if the listener cannot be used
+        (missing bindings, unreachable listener, unknown filter), in which case
+        the caller falls back to a one-off soffice run.
+
+    Raises:
+        ConversionError: If LibreOffice fails to load or export the file.
+    """
+    global _office_desktop
+
+    filter_name = _OFFICE_EXPORT_FILTERS.get(target_ext)
+    if filter_name is None:
+        return False
+
+    try:
+        import uno
+        from com.sun.star.beans import PropertyValue
+        from com.sun.star.connection import NoConnectException
+        from com.sun.star.lang import DisposedException
+    except ImportError:
+        return False
+
+    def properties(**values: object) -> tuple:
+        props = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            props.append(prop)
+        return tuple(props)
+
+    if _office_desktop is None:
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        url = f"uno:socket,host=localhost,port={_office_listener_port};urp;StarOffice.ComponentContext"
+        # The socket may accept a little before the office is fully up
+        for _ in range(20):
+            try:
+                context = resolver.resolve(url)
+                break
+            except NoConnectException:
+                time.sleep(0.25)
+        else:
+            return False
+        _office_desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    if verbose:
+        print(
+            f"Converting {input_path} to {output_path} via LibreOffice listener "
+            f"on port {_office_listener_port} (filter: {filter_name})"
+        )
+
+    store_options = {"FilterName": filter_name, "Overwrite": True}
+    if target_ext in _OFFICE_FILTER_OPTIONS:
+        store_options["FilterOptions"] = _OFFICE_FILTER_OPTIONS[target_ext]
+
+    try:
+        document = _office_desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(input_path)), "_blank", 0, properties(Hidden=True)
+        )
+        if document is None:
+            raise ConversionError(f"LibreOffice could not open {input_path}")
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(output_path)), properties(**store_options)
+            )
+        finally:
+            document.close(True)
+    except DisposedException:
+        # The listener went away; let this and later conversions use soffice
+        _office_desktop = None
+        use_office_listener(None)
+        return False
+    except ConversionError:
+        raise
+    except Exception as e:
+        raise ConversionError(f"LibreOffice failed to convert {input_path}: {e}")
+
+    return True
@@ -5,15 +5,33 @@ This module handles the high-level logic of determining categories,
 validating same-category conversions, and dispatching to the correct backend.
 """
 
+import multiprocessing
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
-from anything2anything.categories import Category, get_category
+from anything2anything.categories import Category, get_category, get_extension
 from anything2anything.converters import (
+    available_cpu_count,
     ConversionError,
     convert_audio,
+    convert_audio_piped,
     convert_image,
+    convert_image_piped,
+    convert_images_batch,
     convert_document,
     convert_video,
+    isolate_libreoffice_profile,
+    limit_ffmpeg_threads,
+    office_listener_supported,
+    OfficeListener,
+    use_office_listener,
+    VideoQuality,
 )
 
 
@@ -23,10 +41,83 @@ class CategoryMismatchError(ConversionError):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class Job:
+    """A validated conversion, carrying everything a converter backend needs."""
+
+    input_path: Path
+    output_path: Path
+    category: Category
+    target_ext: str
+    verbose: bool = False
+    stream: bool = False
+    quality: VideoQuality = VideoQuality.FAST
+
+
+# (input_path, output_path, error) for one finished batch conversion
+_BatchResult = tuple[Path, Path, Optional[BaseException]]
+
+# Most images handed to a single mogrify run, keeping command lines short
+_MOGRIFY_CHUNK_SIZE = 256
+
+# Categories bound once at import, so per-file checks compare by identity
+# instead of looking members up on the enum class each time
+_AUDIO = Category.AUDIO
+_VIDEO = Category.VIDEO
+_IMAGE = Category.IMAGE
+_OFFICE = frozenset({Category.DOCUMENT, Category.SPREADSHEET, Category.PRESENTATION})
+# Categories that can be piped through their tool with --stream
+_STREAMABLE = frozenset({_AUDIO, _IMAGE})
+# Audio inputs FFmpeg cannot read from a pipe: MP4-family files usually keep
+# their index at the end, so they are always converted from the file
+_UNPIPEABLE_AUDIO = frozenset({"m4a"})
+
+
+def _run_audio(job: Job) -> None:
+    """Run an audio job through FFmpeg."""
+    convert_audio(job.input_path, job.output_path, verbose=job.verbose, target_ext=job.target_ext)
+
+
+def _run_video(job: Job) -> None:
+    """Run a video job through FFmpeg at the job's quality."""
+    convert_video(
+        job.input_path,
+        job.output_path,
+        verbose=job.verbose,
+        target_ext=job.target_ext,
+        quality=job.quality,
+    )
+
+
+def _run_image(job: Job) -> None:
+    """Run an image job through ImageMagick."""
+    convert_image(job.input_path, job.output_path, verbose=job.verbose, target_ext=job.target_ext)
+
+
+def _run_office(job: Job) -> None:
+    """Run a document, spreadsheet or presentation job."""
+    convert_document(
+        job.input_path, job.output_path, verbose=job.verbose, target_ext=job.target_ext
+    )
+
+
+# Converter backend for each category
+_DISPATCH: dict[Category, Callable[[Job], None]] = {
+    Category.AUDIO: _run_audio,
+    Category.VIDEO: _run_video,
+    Category.IMAGE: _run_image,
+    Category.DOCUMENT: _run_office,
+    Category.SPREADSHEET: _run_office,
+    Category.PRESENTATION: _run_office,
+}
+
+
 def convert_file(
     input_path: Path,
     output_path: Path,
     verbose: bool = False,
+    stream: bool = False,
+    quality: VideoQuality = VideoQuality.FAST,
 ) -> None:
     """
     Convert a file from one format to another within the same category.
@@ -35,6 +126,10 @@ def convert_file(
         input_path: Path to the input file.
         output_path: Path to the output file.
         verbose: If True, print diagnostic information.
+        stream: If True, pipe audio and image data through the converter's
+            stdin/stdout instead of letting it open the files. Other
+            categories are converted as usual.
+        quality: Speed/size trade-off for video encodes.
 
     Raises:
         FileNotFoundError: If the input file does not exist.
@@ -42,10 +137,25 @@ def convert_file(
         ConversionError: If conversion fails.
         ValueError: If file format is unsupported.
     """
-    # Validate input file exists
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
+    run_job(make_job(input_path, output_path, verbose=verbose, stream=stream, quality=quality))
 
+
+def make_job(
+    input_path: Path,
+    output_path: Path,
+    verbose: bool = False,
+    stream: bool = False,
+    quality: VideoQuality = VideoQuality.FAST,
+) -> Job:
+    """
+    Validate a conversion and describe it as a Job.
+
+    Takes the same arguments as convert_file.
+
+    Raises:
+        CategoryMismatchError: If input and output categories differ.
+        ValueError: If file format is unsupported.
+    """
     # Determine categories
     try:
         input_category = get_category(input_path)
@@ -58,7 +168,7 @@ def convert_file(
         raise ValueError(f"Unsupported output format: {e}")
 
     # Enforce same-category conversion
-    if input_category != output_category:
+    if input_category is not output_category:
         raise CategoryMismatchError(
             f"Cannot convert between different categories.\n"
             f"Input category: {input_category.value}\n"
@@ -66,18 +176,283 @@ def convert_file(
             f"Only conversions within the same category are supported."
         )
 
-    if verbose:
-        print(f"Converting {input_category.value}: {input_path.name} -> {output_path.name}")
+    return Job(
+        input_path=input_path,
+        output_path=output_path,
+        category=input_category,
+        target_ext=get_extension(output_path),
+        verbose=verbose,
+        stream=stream,
+        quality=quality,
+    )
+
+
+def run_job(job: Job) -> None:
+    """
+    Run a conversion prepared by make_job.
+
+    Raises:
+        FileNotFoundError: If the input file does not exist.
+        ConversionError: If conversion fails.
+    """
+    if job.verbose:
+        print(
+            f"Converting {job.category.value}: {job.input_path.name} -> {job.output_path.name}"
+        )
 
     # Dispatch to appropriate converter
-    if input_category == Category.AUDIO:
-        convert_audio(input_path, output_path, verbose=verbose)
-    elif input_category == Category.VIDEO:
-        convert_video(input_path, output_path, verbose=verbose)
-    elif input_category == Category.IMAGE:
-        convert_image(input_path, output_path, verbose=verbose)
-    elif input_category in (Category.DOCUMENT, Category.SPREADSHEET, Category.PRESENTATION):
-        convert_document(input_path, output_path, verbose=verbose)
-    else:
-        raise ConversionError(f"No converter available for category: {input_category.value}")
+    converter = _DISPATCH.get(job.category)
+    if converter is None:
+        raise ConversionError(f"No converter available for category: {job.category.value}")
+
+    try:
+        if job.stream and job.category in _STREAMABLE and not _needs_seekable_input(job):
+            _convert_streamed(job)
+        else:
+            converter(job)
+    except (ConversionError, OSError):
+        # The input is only checked once something has failed, which keeps
+        # the successful path free of an extra stat call
+        if not job.input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {job.input_path}") from None
+        raise
+
+
+def _needs_seekable_input(job: Job) -> bool:
+    """Check whether a job's input cannot be piped to its tool."""
+    return job.category is _AUDIO and get_extension(job.input_path) in _UNPIPEABLE_AUDIO
+
+
+def _convert_streamed(job: Job) -> None:
+    """Convert an audio or image file by piping its contents through the tool."""
+    converter = convert_audio_piped if job.category is _AUDIO else convert_image_piped
+    output_data = converter(job.input_path.read_bytes(), job.target_ext, verbose=job.verbose)
+    job.output_path.write_bytes(output_data)
+
+
+def _default_worker_count(jobs: list[Job]) -> int:
+    """
+    Pick a worker count for a batch of conversions.
+
+    FFmpeg already spreads a single video encode across several threads, so
+    video-only batches get half the CPUs to avoid oversubscription. Audio
+    encoders (libmp3lame, aac, pcm) are single-threaded and get them all.
+    """
+    cpus = available_cpu_count()
+    if jobs and all(job.category is _VIDEO for job in jobs):
+        cpus = max(1, cpus // 2)
+    return max(1, min(cpus, len(jobs)))
+
+
+def convert_files(
+    conversions: list[tuple[Path, Path]],
+    verbose: bool = False,
+    max_workers: Optional[int] = None,
+    quality: VideoQuality = VideoQuality.FAST,
+) -> Iterator[_BatchResult]:
+    """
+    Convert many files in parallel using a pool of worker processes.
+
+    At most twice ``max_workers`` conversions are queued at any time, so
+    large batches do not pile up pending work in memory. When the batch holds
+    several office files and the LibreOffice UNO bindings are available, each
+    worker gets its own OfficeListener for the whole batch, so LibreOffice's
+    startup cost is paid once per worker rather than per file while office
+    files still convert in parallel.
+
+    Args:
+        conversions: (input_path, output_path) pairs to convert.
+        verbose: If True, print diagnostic information.
+        max_workers: Number of worker processes; by default based on the CPU
+            count and the kind of files in the batch.
+        quality: Speed/size trade-off for video encodes.
+
+    Yields:
+        (input_path, output_path, error) for each conversion as it finishes,
+        where error is None on success. Conversions rejected up front
+        (unsupported format, category mismatch) are reported first.
+    """
+    jobs: list[Job] = []
+    for input_path, output_path in conversions:
+        try:
+            jobs.append(make_job(input_path, output_path, verbose=verbose, quality=quality))
+        except (ValueError, ConversionError) as e:
+            yield input_path, output_path, e
+    if not jobs:
+        return
+
+    max_workers = max_workers or _default_worker_count(jobs)
+    if verbose:
+        print(f"Converting {len(jobs)} file(s) using {max_workers} worker(s)")
+
+    pending: dict[Future, list[Job]] = {}
+    limit = max_workers * 2
+
+    with ExitStack() as stack:
+        office_files = sum(job.category in _OFFICE for job in jobs)
+
+        # Worker profiles go in one private directory made here rather than at
+        # predictable paths in the shared temp dir, and are removed with it
+        # once the pool below has shut down
+        profile_root = None
+        if office_files:
+            profile_root = Path(tempfile.mkdtemp(prefix="anything2anything_"))
+            stack.callback(shutil.rmtree, profile_root, ignore_errors=True)
+
+        # One listener per worker: a single soffice process runs its UNO
+        # calls one at a time, so a shared listener would serialize the
+        # batch. Office jobs can land on any worker, so every worker needs
+        # one; they start side by side, costing about one soffice startup.
+        office_ports: list[int] = []
+        if office_files > 1 and office_listener_supported():
+            office_ports = _start_office_listeners(stack, max_workers, verbose)
+
+        # Each worker takes one port in its initializer, or None if the
+        # listeners could not be started, to start soffice per file
+        ports = multiprocessing.SimpleQueue()
+        for port in office_ports + [None] * (max_workers - len(office_ports)):
+            ports.put(port)
+
+        pool = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_batch_worker,
+                initargs=(profile_root, ports, available_cpu_count() // max_workers),
+            )
+        )
+        for task, chunk in _plan_batch(jobs, max_workers):
+            if len(pending) >= limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _batch_results(pending.pop(future), future)
+
+            future = pool.submit(task, chunk)
+            pending[future] = chunk
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from _batch_results(pending.pop(future), future)
+
+
+def _start_office_listeners(stack: ExitStack, count: int, verbose: bool) -> list[int]:
+    """
+    Start ``count`` OfficeListeners side by side, closed when ``stack`` exits.
+
+    Returns:
+        The listeners' ports, or an empty list if any of them failed to start,
+        in which case the ones already started are shut down again.
+    """
+    listeners: list[OfficeListener] = []
+    try:
+        for _ in range(count):
+            listeners.append(stack.enter_context(OfficeListener(wait=False)))
+        for listener in listeners:
+            listener.wait_ready()
+    except ConversionError as e:
+        for listener in listeners:
+            listener.close()
+        # Not fatal: each worker starts soffice per file instead
+        if verbose:
+            print(f"{e}; converting office files one soffice run at a time")
+        return []
+
+    ports = [listener.port for listener in listeners]
+    if verbose:
+        print(f"Started {count} LibreOffice listener(s) on port(s) {', '.join(map(str, ports))}")
+    return ports
+
+
+def _plan_batch(
+    jobs: list[Job],
+    max_workers: int,
+) -> list[tuple[Callable[[list[Job]], list[_BatchResult]], list[Job]]]:
+    """
+    Split a batch into (task, chunk) pairs to run on the worker pool.
+
+    Image batches that mogrify can handle are spread over the workers in a few
+    large chunks; everything else is converted one file per task.
+    """
+    if _mogrify_compatible(jobs):
+        size = min(_MOGRIFY_CHUNK_SIZE, -(-len(jobs) // max_workers))
+        return [
+            (_mogrify_chunk, jobs[start : start + size])
+            for start in range(0, len(jobs), size)
+        ]
+    return [(_convert_chunk, [job]) for job in jobs]
+
+
+def _mogrify_compatible(jobs: list[Job]) -> bool:
+    """
+    Check whether a batch can be converted with ``magick mogrify``.
+
+    mogrify writes each image to one directory, keeping the input basename and
+    switching to one target extension, so every conversion must be image to
+    image and follow that naming.
+    """
+    output_dir = jobs[0].output_path.parent
+    suffix = jobs[0].output_path.suffix
+    return all(
+        job.category is _IMAGE
+        and not job.stream
+        and job.output_path.parent == output_dir
+        and job.output_path.suffix == suffix
+        and job.output_path.stem == job.input_path.stem
+        for job in jobs
+    )
+
+
+def _convert_chunk(chunk: list[Job]) -> list[_BatchResult]:
+    """Convert each file of a chunk on its own, collecting per-file errors."""
+    results: list[_BatchResult] = []
+    for job in chunk:
+        try:
+            run_job(job)
+        except Exception as e:
+            results.append((job.input_path, job.output_path, e))
+        else:
+            results.append((job.input_path, job.output_path, None))
+    return results
+
+
+def _mogrify_chunk(chunk: list[Job]) -> list[_BatchResult]:
+    """
+    Convert a chunk of images with one mogrify run.
+
+    If the run fails, the chunk is converted again file by file so each
+    failing image gets its own error.
+    """
+    output_path = chunk[0].output_path
+    try:
+        convert_images_batch(
+            [job.input_path for job in chunk],
+            output_path.parent,
+            output_path.suffix[1:],
+            verbose=chunk[0].verbose,
+        )
+    except ConversionError:
+        return _convert_chunk(chunk)
+    return [(job.input_path, job.output_path, None) for job in chunk]
+
+
+def _init_batch_worker(
+    profile_root: Optional[Path],
+    office_ports: multiprocessing.SimpleQueue,
+    ffmpeg_threads: int,
+) -> None:
+    """Prepare a batch worker process for running conversions."""
+    limit_ffmpeg_threads(ffmpeg_threads)
+    if profile_root is not None:
+        isolate_libreoffice_profile(profile_root)
+    office_port = office_ports.get()
+    if office_port is not None:
+        use_office_listener(office_port)
+
 
+def _batch_results(chunk: list[Job], future: Future) -> list[_BatchResult]:
+    """Unpack a finished batch future into one result per conversion."""
+    error = future.exception()
+    if error is not None:
+        # The task itself died (e.g. a crashed worker); fail the whole chunk
+        return [(job.input_path, job.output_path, error) for job in chunk]
+    return future.result()
@@ -0,0 +1,31 @@
+"""Shared fixtures for the test suite."""
+
+import os
+import stat
+
+import pytest
+
+from anything2anything.converters import resolve_tool
+
+
+@pytest.fixture
+def stub_tool(tmp_path, monkeypatch):
+    """
+    Install a shell-script stand-in for an external tool.
+
+    Returns a function taking the tool name and the script body; the stub
+    is put first in PATH and tool lookups are re-resolved.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    resolve_tool.cache_clear()
+
+    def install(name, body):
+        path = bin_dir / name
+        path.write_text(f"#!/bin/sh\n{body}\n")
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+        return path
+
+    yield install
+    resolve_tool.cache_clear()
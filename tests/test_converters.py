@@ -0,0 +1,25 @@
+"""Tests for the helpers around external tool invocation."""
+
+import io
+
+from anything2anything.converters import _read_tail
+
+
+def test_read_tail_keeps_short_output():
+    assert _read_tail(io.BytesIO(b"line 1\nline 2\n"), limit=100) == b"line 1\nline 2\n"
+
+
+def test_read_tail_trims_to_whole_lines():
+    data = b"".join(f"frame {i}\n".encode() for i in range(10_000))
+
+    tail = _read_tail(io.BytesIO(data), limit=1000)
+
+    assert tail.startswith(b"...\nframe ")
+    assert tail.endswith(b"frame 9999\n")
+    assert len(tail) <= 1000 + len(b"...\n")
+    # Every kept line is complete
+    assert all(line.startswith(b"frame ") for line in tail.splitlines()[1:])
+
+
+def test_read_tail_empty_stream():
+    assert _read_tail(io.BytesIO(b""), limit=10) == b""
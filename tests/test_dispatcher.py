@@ -0,0 +1,166 @@
+"""Tests for conversion dispatching."""
+
+from pathlib import Path
+
+import pytest
+
+from anything2anything.categories import Category
+from anything2anything.converters import ConversionError, VideoQuality
+from anything2anything.dispatcher import (
+    _MOGRIFY_CHUNK_SIZE,
+    CategoryMismatchError,
+    _convert_chunk,
+    _mogrify_chunk,
+    _mogrify_compatible,
+    _plan_batch,
+    convert_file,
+    make_job,
+    run_job,
+)
+
+
+def test_missing_office_input_is_not_masked_by_stale_output(tmp_path, stub_tool):
+    # soffice exits 0 without writing anything when it cannot load its input
+    stub_tool("soffice", "exit 0")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    stale = out_dir / "report.pdf"
+    stale.write_text("stale")
+
+    with pytest.raises(FileNotFoundError):
+        convert_file(tmp_path / "report.docx", stale)
+    assert stale.read_text() == "stale"
+
+
+def test_unloadable_office_input_is_not_masked_by_stale_output(tmp_path, stub_tool):
+    stub_tool("soffice", "exit 0")
+    source = tmp_path / "report.docx"
+    source.write_text("not really a document")
+    stale = tmp_path / "out" / "report.pdf"
+    stale.parent.mkdir()
+    stale.write_text("stale")
+
+    with pytest.raises(ConversionError, match="did not produce"):
+        convert_file(source, stale)
+
+
+def _image_jobs(tmp_path, names, out_dir="out", ext="webp"):
+    return [
+        make_job(tmp_path / name, tmp_path / out_dir / f"{Path(name).stem}.{ext}")
+        for name in names
+    ]
+
+
+def test_make_job_fills_in_category_and_extension(tmp_path):
+    job = make_job(tmp_path / "clip.MP4", tmp_path / "clip.mov", quality=VideoQuality.BEST)
+
+    assert job.category is Category.VIDEO
+    assert job.target_ext == "mov"
+    assert job.quality is VideoQuality.BEST
+
+
+def test_make_job_rejects_category_mismatch(tmp_path):
+    with pytest.raises(CategoryMismatchError):
+        make_job(tmp_path / "photo.png", tmp_path / "photo.mp3")
+
+
+@pytest.mark.parametrize(
+    ("input_name", "output_name", "message"),
+    [
+        ("notes.xyz", "notes.txt", "Unsupported input format"),
+        ("notes.txt", "notes.xyz", "Unsupported output format"),
+    ],
+)
+def test_make_job_rejects_unsupported_formats(tmp_path, input_name, output_name, message):
+    with pytest.raises(ValueError, match=message):
+        make_job(tmp_path / input_name, tmp_path / output_name)
+
+
+def test_run_job_reports_missing_input(tmp_path, stub_tool):
+    stub_tool("magick", "exit 1")
+
+    with pytest.raises(FileNotFoundError):
+        run_job(make_job(tmp_path / "missing.png", tmp_path / "missing.webp"))
+
+
+def test_run_job_keeps_tool_errors_for_existing_input(tmp_path, stub_tool):
+    stub_tool("magick", "echo 'bad image' >&2; exit 1")
+    source = tmp_path / "photo.png"
+    source.write_bytes(b"png")
+
+    with pytest.raises(ConversionError, match="bad image"):
+        run_job(make_job(source, tmp_path / "photo.webp"))
+
+
+def test_mogrify_compatible_batch(tmp_path):
+    assert _mogrify_compatible(_image_jobs(tmp_path, ["a.png", "b.jpg", "c.heic"]))
+
+
+@pytest.mark.parametrize(
+    "conversions",
+    [
+        # Different output directories
+        [("a.png", "out/a.webp"), ("b.png", "other/b.webp")],
+        # Different target extensions
+        [("a.png", "out/a.webp"), ("b.png", "out/b.jpg")],
+        # Renamed output
+        [("a.png", "out/a.webp"), ("b.png", "out/renamed.webp")],
+        # Not images
+        [("a.wav", "out/a.mp3"), ("b.wav", "out/b.mp3")],
+    ],
+)
+def test_mogrify_incompatible_batches(tmp_path, conversions):
+    jobs = [make_job(tmp_path / src, tmp_path / dst) for src, dst in conversions]
+    assert not _mogrify_compatible(jobs)
+
+
+def test_plan_batch_spreads_images_over_workers(tmp_path):
+    jobs = _image_jobs(tmp_path, [f"{i}.png" for i in range(10)])
+
+    plan = _plan_batch(jobs, max_workers=3)
+
+    assert [task for task, _ in plan] == [_mogrify_chunk] * 3
+    assert [len(chunk) for _, chunk in plan] == [4, 4, 2]
+    assert [job for _, chunk in plan for job in chunk] == jobs
+
+
+def test_plan_batch_caps_mogrify_chunk_size(tmp_path):
+    jobs = _image_jobs(tmp_path, [f"{i}.png" for i in range(_MOGRIFY_CHUNK_SIZE + 1)])
+
+    plan = _plan_batch(jobs, max_workers=1)
+
+    assert [len(chunk) for _, chunk in plan] == [_MOGRIFY_CHUNK_SIZE, 1]
+
+
+def test_plan_batch_converts_other_files_one_by_one(tmp_path):
+    jobs = [
+        make_job(tmp_path / "a.wav", tmp_path / "out/a.mp3"),
+        make_job(tmp_path / "b.png", tmp_path / "out/b.webp"),
+    ]
+
+    plan = _plan_batch(jobs, max_workers=2)
+
+    assert plan == [(_convert_chunk, [jobs[0]]), (_convert_chunk, [jobs[1]])]
+
+
+def test_mogrify_chunk_falls_back_to_one_file_at_a_time(tmp_path, stub_tool):
+    # mogrify fails on the whole chunk; single conversions fail only on "bad"
+    stub_tool(
+        "magick",
+        '[ "$1" = mogrify ] && exit 1\n'
+        'case "$1" in *bad*) echo "cannot read $1" >&2; exit 1;; esac\n'
+        'cp "$1" "$2"',
+    )
+    (tmp_path / "out").mkdir()
+    for name in ("good.png", "bad.png"):
+        (tmp_path / name).write_bytes(b"png")
+    jobs = _image_jobs(tmp_path, ["good.png", "bad.png"])
+
+    results = _mogrify_chunk(jobs)
+
+    assert [(src.name, error is None) for src, _, error in results] == [
+        ("good.png", True),
+        ("bad.png", False),
+    ]
+    assert isinstance(results[1][2], ConversionError)
+    assert (tmp_path / "out" / "good.webp").exists()
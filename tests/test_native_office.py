@@ -0,0 +1,165 @@
+"""Tests for the office conversions done without LibreOffice."""
+
+import zipfile
+
+import pytest
+
+from anything2anything.converters import (
+    _copy_office_file,
+    _csv_cell_value,
+    _csv_to_xlsx,
+    _rtf_escape,
+    _txt_to_rtf,
+    _xlsx_to_csv,
+)
+
+
+@pytest.mark.parametrize(
+    ("field", "expected"),
+    [
+        ("", None),
+        ("42", 42),
+        ("-7", -7),
+        ("3.5", 3.5),
+        ("1e3", 1000.0),
+        ("abc", "abc"),
+        ("1_000", "1_000"),
+        ("nan", "nan"),
+        ("inf", "inf"),
+        ("-Infinity", "-Infinity"),
+        ("007", 7),
+    ],
+)
+def test_csv_cell_value(field, expected):
+    value = _csv_cell_value(field)
+    assert value == expected
+    assert type(value) is type(expected)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("plain", "plain"),
+        ("a{b}c\\d", "a\\{b\\}c\\\\d"),
+        ("a\tb", "a\\tab b"),
+        ("é", "\\u233?"),
+        # Above 0x7fff, \uN takes the signed 16-bit value
+        ("￥", "\\u-27?"),
+        # Outside the BMP: a UTF-16 surrogate pair
+        ("\U0001f600", "\\u-10179?\\u-8704?"),
+    ],
+)
+def test_rtf_escape(text, expected):
+    assert _rtf_escape(text) == expected
+
+
+def test_txt_to_rtf(tmp_path):
+    source = tmp_path / "in.txt"
+    source.write_text("first {line}\nsecond\n", encoding="utf-8")
+    target = tmp_path / "out.rtf"
+
+    assert _txt_to_rtf(source, target)
+    body = target.read_text(encoding="ascii")
+    assert body.startswith("{\\rtf1")
+    assert "first \\{line\\}\\par\nsecond\\par\n" in body
+
+
+def test_txt_to_rtf_rejects_non_utf8(tmp_path):
+    source = tmp_path / "in.txt"
+    source.write_bytes(b"caf\xe9\n")
+    target = tmp_path / "out.rtf"
+
+    assert not _txt_to_rtf(source, target)
+    assert not target.exists()
+
+
+def test_copy_onto_itself_is_a_no_op(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("a,b\n")
+
+    assert _copy_office_file(path, path)
+    assert path.read_text() == "a,b\n"
+
+
+def test_csv_xlsx_round_trip(tmp_path):
+    pytest.importorskip("openpyxl")
+    source = tmp_path / "in.csv"
+    source.write_text("name,count,ratio\nwidget,3,0.5\ngadget,,0.25\n", encoding="utf-8")
+    workbook = tmp_path / "mid.xlsx"
+    target = tmp_path / "out.csv"
+
+    assert _csv_to_xlsx(source, workbook)
+    assert _xlsx_to_csv(workbook, target)
+    assert target.read_text(encoding="utf-8").splitlines() == [
+        "name,count,ratio",
+        "widget,3,0.5",
+        "gadget,,0.25",
+    ]
+
+
+def test_xlsx_to_csv_writes_booleans_like_libreoffice(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append([True, False, 2.0])
+    source = tmp_path / "in.xlsx"
+    workbook.save(source)
+    target = tmp_path / "out.csv"
+
+    assert _xlsx_to_csv(source, target)
+    assert target.read_bytes() == b"TRUE,FALSE,2\r\n"
+
+
+def test_xlsx_to_csv_falls_back_on_uncached_formula(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append([1, 2, "=A1+B1"])
+    source = tmp_path / "in.xlsx"
+    workbook.save(source)
+    target = tmp_path / "out.csv"
+
+    assert not _xlsx_to_csv(source, target)
+    assert not target.exists()
+
+
+def test_xlsx_to_csv_falls_back_on_corrupt_file(tmp_path):
+    pytest.importorskip("openpyxl")
+    source = tmp_path / "in.xlsx"
+    source.write_bytes(b"not a zip file")
+
+    assert not _xlsx_to_csv(source, tmp_path / "out.csv")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "a,b\x00c\n",
+        "x" * 200_000 + "\n",
+    ],
+    ids=["nul-byte", "oversized-field"],
+)
+def test_csv_to_xlsx_falls_back_on_unsupported_content(tmp_path, content):
+    pytest.importorskip("openpyxl")
+    source = tmp_path / "in.csv"
+    source.write_text(content, encoding="utf-8")
+
+    assert not _csv_to_xlsx(source, tmp_path / "out.xlsx")
+
+
+def test_xlsx_to_csv_falls_back_on_damaged_sheet(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append([1, 2])
+    intact = tmp_path / "intact.xlsx"
+    workbook.save(intact)
+    # Same workbook with the sheet XML cut off halfway
+    source = tmp_path / "in.xlsx"
+    with zipfile.ZipFile(intact) as src, zipfile.ZipFile(source, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = data[: len(data) // 2]
+            dst.writestr(item, data)
+    target = tmp_path / "out.csv"
+
+    assert not _xlsx_to_csv(source, target)
+    assert not target.exists()